@@ -1,28 +1,19 @@
-from src.calendar.fetcher import OutlookCalendarFetcher
+from src.calendar.com_singleton import get_calendar, get_namespace, reset as reset_outlook
+from src.calendar.fetcher import OutlookCalendarFetcher, EVENT_PROPERTIES
 from src.utils.text_cleaner import clean_body_text
+from src.utils.logging_config import BufferedFileHandler
 import sys
-import io
 import logging
 import os
 import argparse
 import time
-from datetime import datetime
+import threading
 
-# Create logs directory if it doesn't exist
-os.makedirs('logs', exist_ok=True)
+# JSON exports with fewer events than this are written without pandas
+PANDAS_EXPORT_THRESHOLD = 1000
 
-# Fix console encoding for Unicode support
-sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
-
-# Set up logging with UTF-8 encoding
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('logs/outlook_calendar.log', encoding='utf-8'),
-        logging.StreamHandler()
-    ]
-)
+# Seconds between checks while waiting for Outlook to sync
+SYNC_POLL_INTERVAL = 0.25
 
 def parse_args():
     """Parse command-line arguments"""
@@ -30,13 +21,58 @@ def parse_args():
     parser.add_argument('--days-back', type=int, default=1, help='Number of days to look back')
     parser.add_argument('--days-forward', type=int, default=1, help='Number of days to look forward')
     parser.add_argument('--export-json', action='store_true', help='Export events to JSON file')
-    parser.add_argument('--export-dir', type=str, default='exports', help='Directory to save exported JSON files')
+    parser.add_argument('--export-format', choices=['json', 'feather', 'parquet'], help='Export events in the given format (implies export)')
+    parser.add_argument('--export-dir', type=str, default='exports', help='Directory to save exported files')
     parser.add_argument('--sync-timeout', type=int, default=10, help='Timeout in seconds for Outlook synchronization')
     parser.add_argument('--sync-retries', type=int, default=3, help='Number of times to retry synchronization')
     parser.add_argument('--force-full-sync', action='store_true', help='Force a full synchronization of Outlook')
+    parser.add_argument('--include-body', action='store_true', help='Fetch and clean event bodies (slower for large meeting invites)')
+    parser.add_argument('--verbose', action='store_true', help='Print the details of every event instead of just a summary')
     parser.add_argument('--calendar-name', type=str, help='Specify a calendar name (default: primary calendar)')
     return parser.parse_args()
 
+class _SyncEndHandler:
+    """Event sink for an Outlook SyncObject that records when a sync ends"""
+    
+    def __init__(self):
+        self.finished = threading.Event()
+    
+    def OnSyncEnd(self):
+        self.finished.set()
+
+def _wait_for_sync(namespace, items, initial_count, timeout):
+    """Start a send/receive and wait until Outlook signals its end or timeout passes
+    
+    Falls back to watching the calendar item count when the profile has
+    no sync objects (e.g. an offline or cached-only profile).
+    
+    Returns:
+        int: Item count of the calendar's Items collection once the wait is over
+    """
+    import pythoncom
+    import win32com.client
+    
+    deadline = time.monotonic() + timeout
+    sync_objects = namespace.SyncObjects
+    
+    if sync_objects.Count > 0:
+        sync_obj = sync_objects.Item(1)
+        handler = win32com.client.WithEvents(sync_obj, _SyncEndHandler)
+        sync_obj.Start()
+        while not handler.finished.is_set() and time.monotonic() < deadline:
+            # COM events are delivered through this thread's message queue
+            pythoncom.PumpWaitingMessages()
+            handler.finished.wait(SYNC_POLL_INTERVAL)
+        if handler.finished.is_set():
+            logging.info("Outlook reported the end of synchronization")
+        return items.Count
+    
+    final_count = items.Count
+    while final_count == initial_count and time.monotonic() < deadline:
+        time.sleep(SYNC_POLL_INTERVAL)
+        final_count = items.Count
+    return final_count
+
 def sync_outlook(timeout=10, retries=3, force_full=False, calendar_name=None):
     """Force Outlook to synchronize before fetching events
     
@@ -47,35 +83,20 @@ def sync_outlook(timeout=10, retries=3, force_full=False, calendar_name=None):
         calendar_name (str): Name of the calendar to sync (None for default)
     
     Returns:
-        bool: True if synchronization was successful
+        The synchronized calendar folder, or None if synchronization failed
     """
-    import win32com.client
-    
     for attempt in range(1, retries + 1):
         try:
             logging.info(f"Initializing Outlook synchronization (attempt {attempt}/{retries})...")
             
-            # Connect to Outlook
-            outlook = win32com.client.Dispatch("Outlook.Application")
-            namespace = outlook.GetNamespace("MAPI")
+            # Reuse the shared Outlook connection and calendar folder
+            namespace = get_namespace()
+            calendar = get_calendar(calendar_name)
             
-            # Get the calendar folder - default or specified
-            if calendar_name:
-                found = False
-                for folder in namespace.Folders.Item(1).Folders:
-                    if folder.Name == "Calendar" or folder.Name == calendar_name:
-                        calendar = folder
-                        found = True
-                        logging.info(f"Using calendar: {folder.Name}")
-                        break
-                if not found:
-                    logging.warning(f"Calendar '{calendar_name}' not found, using default")
-                    calendar = namespace.GetDefaultFolder(9)  # 9 is the calendar folder
-            else:
-                calendar = namespace.GetDefaultFolder(9)  # 9 is the calendar folder
-            
-            # Force sync by accessing items and more direct sync methods
-            initial_count = calendar.Items.Count
+            # Fetch the Items collection once; every .Items access creates a
+            # new COM collection and every .Count is a round-trip
+            items = calendar.Items
+            initial_count = items.Count
             logging.info(f"Initial calendar items count: {initial_count}")
             
             if force_full:
@@ -86,28 +107,20 @@ def sync_outlook(timeout=10, retries=3, force_full=False, calendar_name=None):
                 except:
                     logging.info("Full synchronization not available, using standard methods")
             
-            # Get all items to force update
-            all_items = calendar.Items
-            all_items.Sort("[Start]")  # Sort to ensure we get through all items
-            all_items.IncludeRecurrences = True
-            
-            # Process through all items to ensure they're loaded
-            if all_items.Count > 0:
-                logging.info(f"Processing through {all_items.Count} items to ensure complete sync")
-                # Just accessing a sample of items can help force sync
-                item_sample = min(100, all_items.Count)
-                for i in range(1, item_sample + 1):
-                    try:
-                        _ = all_items.Item(i).Subject
-                    except:
-                        pass
+            # Touching both ends of the collection makes Outlook enumerate it
+            # in a single call instead of one call per item. The order does not
+            # matter here, so the calendar is not sorted; recurrences are not
+            # expanded either, they would make Count meaningless
+            if initial_count > 0:
+                logging.info(f"Loading {initial_count} items to ensure complete sync")
+                _ = items.GetFirst()
+                _ = items.GetLast()
                         
-            # Add a delay to allow sync to complete
-            logging.info(f"Waiting {timeout} seconds for synchronization to complete...")
-            time.sleep(timeout)
+            # Wait for the sync to end, returning early once Outlook reports it
+            logging.info(f"Waiting up to {timeout} seconds for synchronization to complete...")
+            final_count = _wait_for_sync(namespace, items, initial_count, timeout)
             
             # Verify sync by checking if count changed
-            final_count = calendar.Items.Count
             logging.info(f"Final calendar items count: {final_count}")
             
             if final_count != initial_count:
@@ -116,109 +129,147 @@ def sync_outlook(timeout=10, retries=3, force_full=False, calendar_name=None):
                 logging.info("No change in item count - calendar may already be up to date")
             
             logging.info("Outlook synchronization completed successfully")
-            return True
+            return calendar
         except Exception as e:
             logging.error(f"Error during synchronization attempt {attempt}: {str(e)}")
+            # Dispatch a fresh connection on the next attempt
+            reset_outlook()
             if attempt < retries:
                 wait_time = attempt * 2  # Increase wait time with each retry
                 logging.info(f"Retrying in {wait_time} seconds...")
                 time.sleep(wait_time)
             else:
                 logging.error("All synchronization attempts failed")
-                return False
+                return None
+
+def _build_events_df(columns):
+    """Build the export DataFrame straight from the event columns"""
+    import pandas as pd
+    
+    return pd.DataFrame({
+        "Subject": pd.Series(columns["Subject"], dtype=pd.StringDtype()),
+        "Start": pd.to_datetime(columns["Start"]),
+        "End": pd.to_datetime(columns["End"]),
+        "Location": pd.Series(columns["Location"], dtype=pd.StringDtype()),
+        "Body": pd.Series(columns["Body"], dtype=pd.StringDtype()),
+        "Categories": pd.Series(columns["Categories"], dtype=pd.StringDtype()),
+    }, copy=False)
 
-def main():
-    """Main entry point for the application"""
+def _format_events(columns):
+    """Render every event as readable text, built up as one string"""
+    lines = []
+    rows = zip(*(columns[name] for name in EVENT_PROPERTIES))
+    for subject, start, end, location, body, categories in rows:
+        lines.append(f"\nSubject: {subject}\n")
+        lines.append(f"Start: {start}\n")
+        lines.append(f"End: {end}\n")
+        lines.append(f"Location: {location}\n")
+        lines.append(f"Categories: {categories}\n")
+        if body:
+            lines.append(f"Body:\n{body}\n")
+        lines.append("-" * 50 + "\n")
+    return "".join(lines)
+
+def main(run_ts=None):
+    """
+    Main entry point for the application
+    
+    Args:
+        run_ts: Timestamp naming this run's log and export files (default now)
+    """
     # Parse command line arguments
     args = parse_args()
     
+    # One timestamp per run, shared by the log and any exported file
+    run_ts = run_ts or time.strftime('%Y%m%d_%H%M%S')
+    logging.info(f"Starting run {run_ts}")
+    
     # Synchronize Outlook first with enhanced parameters
-    sync_successful = sync_outlook(
+    calendar = sync_outlook(
         timeout=args.sync_timeout,
         retries=args.sync_retries,
         force_full=args.force_full_sync,
         calendar_name=args.calendar_name
     )
     
-    if not sync_successful:
+    if calendar is None:
         logging.warning("Proceeding with event collection despite synchronization issues")
     
-    # Initialize the fetcher and get events
-    fetcher = OutlookCalendarFetcher()
+    # Initialize the fetcher on the synchronized calendar and get events
+    fetcher = OutlookCalendarFetcher(calendar=calendar, calendar_name=args.calendar_name)
     
-    # Get events using the standard method (without calendar_name parameter)
-    # since the OutlookCalendarFetcher class may not support this parameter yet
-    filtered_items = fetcher.get_outlook_events(
+    # Read every event into plain column lists in one pass over Outlook.
+    # Body is the largest property by far, only pull it when asked
+    properties = tuple(p for p in EVENT_PROPERTIES if args.include_body or p != "Body")
+    columns = fetcher.get_outlook_event_columns(
         days_back=args.days_back, 
-        days_forward=args.days_forward
+        days_forward=args.days_forward,
+        properties=properties,
+        exclude_categories=("OOO",)
     )
+    event_count = len(columns["Subject"])
     
-    # If a specific calendar was used for sync, filter the results manually
-    if hasattr(args, 'calendar_name') and args.calendar_name:
-        logging.info(f"Using specified calendar: {args.calendar_name}")
-        calendar_name = args.calendar_name.lower()
-        # No filtering here, as we're using the calendar selected during sync
-        # The sync_outlook function already selected the appropriate calendar
-
-    # Process events
-    events = []
-    for item in filtered_items:
-        try:
-            # Skip events with OOO category
-            if hasattr(item, 'Categories') and item.Categories and "OOO" in item.Categories:
-                logging.info(f"Skipping OOO event: {item.Subject}")
-                continue
-            
-            # Validate required fields
-            if not hasattr(item, 'Start') or not hasattr(item, 'End') or not item.Start or not item.End:
-                logging.warning(f"Skipping event with missing dates: {item.Subject if hasattr(item, 'Subject') else 'Unknown'}")
-                continue
-                
-            logging.info(f"Found event: {item.Subject}")
-            
-            event = {
-                "Subject": item.Subject if hasattr(item, 'Subject') else "Untitled Event",
-                # Convert COM datetime objects to standard Python datetime objects
-                "Start": datetime(
-                    item.Start.year, item.Start.month, item.Start.day, 
-                    item.Start.hour, item.Start.minute, item.Start.second
-                ) if hasattr(item, 'Start') and item.Start else None,
-                "End": datetime(
-                    item.End.year, item.End.month, item.End.day, 
-                    item.End.hour, item.End.minute, item.End.second
-                ) if hasattr(item, 'End') and item.End else None,
-                "Location": item.Location if hasattr(item, 'Location') else "",
-                "Body": clean_body_text(item.Body) if hasattr(item, 'Body') else "",
-                "Categories": item.Categories if hasattr(item, 'Categories') else ""
-            }
-            events.append(event)
-        except Exception as e:
-            logging.error(f"Error processing event: {str(e)}")
-            continue
+    if args.include_body:
+        columns["Body"] = [clean_body_text(body) for body in columns["Body"]]
+    else:
+        columns["Body"] = [""] * event_count
     
-    logging.info(f"Retrieved {len(events)} events")
+    # One summary line instead of a log record per event
+    logging.info("Found %d events: %s", event_count, ", ".join(columns["Subject"]))
     
     # Run exporter if requested
-    if args.export_json and events:
-        from src.exporters.json_exporter import JsonExporter
-        import pandas as pd
-        
-        # Convert events to DataFrame
-        events_df = pd.DataFrame(events)
-        
-        # Export events to JSON
-        exporter = JsonExporter(output_dir=args.export_dir)
+    export_format = args.export_format or ('json' if args.export_json else None)
+    if export_format and event_count:
+        filename = f"calendar_events_{run_ts}.{export_format}"
         try:
-            filename = exporter.export_events(events_df, filename=f"calendar_events_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+            if export_format == 'json':
+                from src.exporters.json_exporter import JsonExporter
+                exporter = JsonExporter(output_dir=args.export_dir)
+                if event_count < PANDAS_EXPORT_THRESHOLD:
+                    # Small exports skip the pandas import and DataFrame entirely
+                    rows = zip(*(columns[name] for name in EVENT_PROPERTIES))
+                    records = [dict(zip(EVENT_PROPERTIES, row)) for row in rows]
+                    filename = exporter.export_records(records, filename=filename)
+                else:
+                    events_df = _build_events_df(columns)
+                    filename = exporter.export_events(events_df, filename=filename)
+            else:
+                from src.exporters.columnar_exporter import ColumnarExporter
+                exporter = ColumnarExporter(output_dir=args.export_dir)
+                events_df = _build_events_df(columns)
+                filename = exporter.export_events(events_df, fmt=export_format, filename=filename)
             logging.info(f"Events exported to {filename}")
         except Exception as e:
             logging.error(f"Failed to export events: {str(e)}")
         
-    # Just display summary instead of all event details
-    if events:
-        print(f"\nFound {len(events)} calendar events.")
+    # Display the summary, or every event in a single write when verbose
+    if event_count:
+        if args.verbose:
+            sys.stdout.write(_format_events(columns))
+        print(f"\nFound {event_count} calendar events.")
     else:
         print("No events found or error occurred")
 
+def _configure_output(run_ts):
+    """Set up console encoding and logging for a command-line run"""
+    # Create logs directory if it doesn't exist
+    os.makedirs('logs', exist_ok=True)
+    
+    # Fix console encoding for Unicode support in place, buffering output
+    # instead of flushing every line
+    sys.stdout.reconfigure(encoding='utf-8', line_buffering=False)
+    
+    # Set up logging with UTF-8 encoding; the log file is opened on first use
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            BufferedFileHandler(f'logs/outlook_calendar_{run_ts}.log', encoding='utf-8', delay=True),
+            logging.StreamHandler()
+        ]
+    )
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    run_ts = time.strftime('%Y%m%d_%H%M%S')
+    _configure_output(run_ts)
+    main(run_ts)
\ No newline at end of file
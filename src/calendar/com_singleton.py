@@ -0,0 +1,50 @@
+import logging
+import threading
+import pythoncom
+import win32com.client
+
+# COM objects are bound to the apartment of the thread that created them, so
+# each thread keeps its own connection; entries go away when the thread ends
+_local = threading.local()
+
+
+def _find_calendar(namespace, calendar_name):
+    """Look up a calendar folder on the namespace"""
+    if calendar_name:
+        for folder in namespace.Folders.Item(1).Folders:
+            if folder.Name == calendar_name:
+                logging.info(f"Using calendar: {folder.Name}")
+                return folder
+        logging.warning(f"Calendar '{calendar_name}' not found, using default")
+
+    return namespace.GetDefaultFolder(win32com.client.constants.olFolderCalendar)
+
+
+def get_namespace():
+    """Return the MAPI namespace of the shared Outlook connection for this thread"""
+    if not getattr(_local, "com_initialized", False):
+        # Initialize COM once per thread; reset() keeps the apartment
+        pythoncom.CoInitialize()
+        _local.com_initialized = True
+
+    namespace = getattr(_local, "namespace", None)
+    if namespace is None:
+        outlook = win32com.client.gencache.EnsureDispatch("Outlook.Application")
+        namespace = _local.namespace = outlook.GetNamespace("MAPI")
+        _local.calendars = {}
+    return namespace
+
+
+def get_calendar(calendar_name=None):
+    """Return the named calendar folder (default calendar if None) for this thread"""
+    namespace = get_namespace()
+    calendar = _local.calendars.get(calendar_name)
+    if calendar is None:
+        calendar = _local.calendars[calendar_name] = _find_calendar(namespace, calendar_name)
+    return calendar
+
+
+def reset():
+    """Drop this thread's Outlook objects so the next call dispatches again"""
+    _local.namespace = None
+    _local.calendars = {}
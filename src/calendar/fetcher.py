@@ -1,78 +1,245 @@
-import win32com.client
-import pythoncom  # Add this import
+import pythoncom
+import functools
+from collections import namedtuple
+from contextlib import contextmanager
+from operator import attrgetter
 from datetime import datetime, timedelta
 import logging
+from src.calendar.com_singleton import get_calendar
+
+log = logging.getLogger(__name__)
+
+# Properties read for each event by fetch_event_columns, in column order
+EVENT_PROPERTIES = ("Subject", "Start", "End", "Location", "Body", "Categories")
+
+# Jet filter date format: US month/day order with a 12-hour clock, since
+# Outlook expects 12-hour times when an AM/PM designator is given
+_FILTER_DATETIME_FORMAT = "%m/%d/%Y %I:%M %p"
+
+# AppointmentItem.RecurrenceState of an unmodified occurrence of a series
+# (olApptOccurrence); exceptions and single meetings have their own body
+_OCCURRENCE_STATE = 2
+
+# Properties holding COM datetimes, converted to Python datetimes when read
+_DATETIME_PROPERTIES = frozenset(("Start", "End"))
+
+def to_python_datetime(com_time):
+    """Convert a COM datetime into a naive Python datetime in a single pass"""
+    return datetime(*com_time.timetuple()[:6])
+
+@functools.lru_cache(maxsize=16)
+def _event_row_type(properties):
+    """Named tuple type with one field per requested property"""
+    return namedtuple("EventRow", properties)
+
+@contextmanager
+def _com_apartment():
+    """Hold a COM apartment reference for the current thread while the block runs"""
+    pythoncom.CoInitialize()
+    try:
+        yield
+    finally:
+        pythoncom.CoUninitialize()
 
 class OutlookCalendarFetcher:
     """Class to fetch calendar events from Outlook"""
     
-    def __init__(self):
-        """Initialize the Outlook connection"""
-        self.outlook = None
-        self.namespace = None
-        self.calendar = None
+    def __init__(self, calendar=None, calendar_name=None):
+        """Initialize the Outlook connection
         
-        try:
-            # Initialize COM for this thread
-            pythoncom.CoInitialize()
-            
-            self.outlook = win32com.client.Dispatch("Outlook.Application")
-            self.namespace = self.outlook.GetNamespace("MAPI")
-            self.calendar = self.namespace.GetDefaultFolder(9)  # 9 = olFolderCalendar
-        except Exception as e:
-            logging.error(f"Failed to initialize Outlook connection: {e}", exc_info=True)
-    
-    def fetch_events(self, start_date, end_date):
-        """Fetch events between the specified dates"""
-        if not all([self.outlook, self.namespace, self.calendar]):
-            # Try to initialize again in case this is called from a different thread
+        Args:
+            calendar: Already connected calendar folder to reuse (optional)
+            calendar_name (str): Name of the calendar to use when connecting
+        """
+        self.calendar = calendar
+        self.calendar_name = calendar_name
+        
+        if self.calendar is None:
             try:
-                pythoncom.CoInitialize()
-                self.outlook = win32com.client.Dispatch("Outlook.Application")
-                self.namespace = self.outlook.GetNamespace("MAPI")
-                self.calendar = self.namespace.GetDefaultFolder(9)
+                self._connect()
             except Exception as e:
-                logging.error(f"Failed to reinitialize Outlook connection: {e}", exc_info=True)
-                return []
-            
-        try:
-            # Format dates and create restriction
-            start_str = start_date.strftime("%d/%m/%Y %H:%M %p")
-            end_str = end_date.strftime("%d/%m/%Y %H:%M %p")
+                log.error(f"Failed to initialize Outlook connection: {e}", exc_info=True)
+    
+    def _connect(self):
+        """Get the calendar folder from the shared Outlook connection"""
+        self.calendar = get_calendar(self.calendar_name)
+    
+    def fetch_events(self, start_date, end_date, exclude_categories=()):
+        """Yield events starting between the specified dates, in start order
+        
+        Args:
+            start_date (datetime): Start of the window (inclusive)
+            end_date (datetime): End of the window (exclusive)
+            exclude_categories (iterable): Categories Outlook should filter out
+        """
+        for _, item in self._scan_events(start_date, end_date, exclude_categories):
+            yield item
+    
+    def _scan_events(self, start_date, end_date, exclude_categories=()):
+        """Yield (start, item) pairs for fetch_events, start already converted
+        
+        The window check has to read Start anyway, so callers get it back
+        instead of reading it from the item a second time.
+        """
+        with _com_apartment():
+            if self.calendar is None:
+                # Try to initialize again in case this is called from a different thread
+                try:
+                    self._connect()
+                except Exception as e:
+                    log.error(f"Failed to reinitialize Outlook connection: {e}", exc_info=True)
+                    return
             
-            # Get items
-            items = self.calendar.Items
-            items.Sort("[Start]")
-            items.IncludeRecurrences = True
+            try:
+                start_str = start_date.strftime(_FILTER_DATETIME_FORMAT)
+                # The format drops seconds, so round the end bound up a minute
+                end_str = (end_date + timedelta(minutes=1)).strftime(_FILTER_DATETIME_FORMAT)
             
-            restriction = f"[Start] >= '{start_str}' AND [Start] < '{end_str}'"
-            logging.info(f"Formatted restriction: {restriction}")
+                # Get items sorted by start so the scan can stop at the window end.
+                # Outlook only expands recurrences on a collection sorted by Start
+                # before IncludeRecurrences is set, so the full calendar is sorted
+                # here rather than a restricted subset
+                items = self.calendar.Items
+                items.Sort("[Start]")
+                items.IncludeRecurrences = True
             
-            filtered_items = items.Restrict(restriction)
-            logging.info(f"Retrieved {filtered_items.Count if hasattr(filtered_items, 'Count') else '?'} items")
+                # Bound both ends so Outlook stops matching past the window; the
+                # exact end is still checked below
+                restriction = f"[Start] >= '{start_str}' AND [Start] < '{end_str}'"
+                for category in exclude_categories:
+                    restriction += f" AND NOT ([Categories] = '{category}')"
+                log.info(f"Formatted restriction: {restriction}")
             
-            # Convert to a list to make it easier to work with
-            events = []
-            for item in filtered_items:
-                events.append(item)
+                item = items.Find(restriction)
+            except Exception as e:
+                log.error(f"Error fetching Outlook events: {e}", exc_info=True)
+                return
             
-            return events
+            count = 0
+            while item is not None:
+                # Skip a single unreadable item instead of ending the scan
+                try:
+                    start = to_python_datetime(item.Start)
+                except (AttributeError, pythoncom.com_error) as e:
+                    log.error("Error reading event start: %s", e)
+                    item = items.FindNext()
+                    continue
+                if start >= end_date:
+                    break
+                count += 1
+                yield start, item
+                item = items.FindNext()
             
-        except Exception as e:
-            logging.error(f"Error fetching Outlook events: {e}", exc_info=True)
-            return []
+            log.info(f"Retrieved {count} items")
         
-    def __del__(self):
-        """Cleanup COM resources when the object is destroyed"""
-        try:
-            pythoncom.CoUninitialize()
-        except:
-            pass
+    def iter_event_rows(self, start_date, end_date, properties=EVENT_PROPERTIES,
+                        exclude_categories=()):
+        """Yield one named tuple of plain property values per event, in start order
+        
+        Each property is read once per event, so callers work with plain Python
+        values instead of paying a COM call on every access. Events are read
+        as they are consumed, so callers can stop early.
+        
+        Args:
+            start_date (datetime): Start of the window (inclusive)
+            end_date (datetime): End of the window (exclusive)
+            properties (tuple): Outlook item properties to read
+            exclude_categories (iterable): Categories to leave out
+        """
+        excluded = set(exclude_categories)
+        make_row = _event_row_type(tuple(properties))._make
+        
+        # Categories are read and checked first, so skipped events never pull
+        # the remaining properties (Body in particular)
+        check_categories = bool(excluded) and "Categories" in properties
+        
+        # Unmodified occurrences of a series share the master's body, so it is
+        # pulled once per series for this call
+        read_body = "Body" in properties
+        series_bodies = {}
+        
+        # Start comes from the scan, already converted
+        rest = tuple(
+            name for name in properties
+            if not (check_categories and name == "Categories") and name not in ("Body", "Start")
+        )
+        
+        com_dates = _DATETIME_PROPERTIES.intersection(rest)
+        
+        # Bind the property reads once; attrgetter returns a bare value for a single name
+        read_rest = attrgetter(*rest) if rest else lambda item: ()
+        if len(rest) == 1:
+            read_single = read_rest
+            read_rest = lambda item: (read_single(item),)
+        
+        for start, item in self._scan_events(start_date, end_date, exclude_categories):
+            try:
+                if check_categories:
+                    categories = item.Categories
+                    # Outlook already filters excluded categories; this only catches stragglers
+                    if excluded.intersection(c.strip() for c in (categories or "").split(',')):
+                        log.debug("Skipping event missed by the category filter: %s", categories)
+                        continue
+                row = read_rest(item)
+                if read_body:
+                    if item.RecurrenceState == _OCCURRENCE_STATE:
+                        series_id = item.GlobalAppointmentID
+                        body = series_bodies.get(series_id)
+                        if body is None:
+                            body = series_bodies[series_id] = item.Body
+                    else:
+                        body = item.Body
+            except (AttributeError, pythoncom.com_error) as e:
+                log.error("Error reading event: %s", e)
+                continue
             
-    def get_outlook_events(self, days_back=1, days_forward=1):
-        """Legacy method for backwards compatibility"""
-        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-        start_date = today - timedelta(days=days_back)
-        end_date = today + timedelta(days=days_forward)
+            values = dict(zip(rest, row))
+            values["Start"] = start
+            if check_categories:
+                values["Categories"] = categories
+            if read_body:
+                values["Body"] = body
+            subject = values.get("Subject", "")
+            
+            # Validate and convert the date fields read here
+            if any(not values[name] for name in com_dates):
+                log.debug("Skipping event with missing dates: %s", subject)
+                continue
+            for name in com_dates:
+                values[name] = to_python_datetime(values[name])
+            
+            yield make_row(values[name] for name in properties)
+    
+    def fetch_event_columns(self, start_date, end_date, properties=EVENT_PROPERTIES,
+                            exclude_categories=()):
+        """Read events into one list per property in a single pass over Outlook
+        
+        Args:
+            start_date (datetime): Start of the window (inclusive)
+            end_date (datetime): End of the window (exclusive)
+            properties (tuple): Outlook item properties to read
+            exclude_categories (iterable): Categories to leave out
         
-        return self.fetch_events(start_date, end_date)
\ No newline at end of file
+        Returns:
+            dict: Property name to list of values, in start order
+        """
+        rows = list(self.iter_event_rows(start_date, end_date, properties, exclude_categories))
+        if not rows:
+            return {name: [] for name in properties}
+        return {name: list(values) for name, values in zip(properties, zip(*rows))}
+    
+    def get_outlook_events(self, days_back=1, days_forward=1, exclude_categories=()):
+        """Legacy method for backwards compatibility"""
+        start_date, end_date = _date_window(days_back, days_forward)
+        return self.fetch_events(start_date, end_date, exclude_categories)
+    
+    def get_outlook_event_columns(self, days_back=1, days_forward=1, properties=EVENT_PROPERTIES,
+                                  exclude_categories=()):
+        """Columnar counterpart of get_outlook_events, see fetch_event_columns"""
+        start_date, end_date = _date_window(days_back, days_forward)
+        return self.fetch_event_columns(start_date, end_date, properties, exclude_categories)
+
+def _date_window(days_back, days_forward):
+    """Return the (start, end) datetimes around today's midnight"""
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    return today - timedelta(days=days_back), today + timedelta(days=days_forward)
\ No newline at end of file
@@ -0,0 +1,81 @@
+import os
+import logging
+from datetime import datetime
+from typing import Optional
+import pandas as pd
+
+
+class ColumnarExporter:
+    """Exports calendar events to Arrow Feather or Parquet files"""
+
+    FORMATS = {
+        "feather": ".feather",
+        "parquet": ".parquet",
+    }
+
+    def __init__(self, output_dir: str = "exports"):
+        """
+        Initialize the exporter with an output directory
+
+        Args:
+            output_dir: Directory to save exported files
+        """
+        self.output_dir = output_dir
+        self.logger = logging.getLogger(__name__)
+
+        try:
+            os.makedirs(output_dir, exist_ok=True)
+        except OSError as e:
+            self.logger.error(
+                f"Failed to create output directory '{output_dir}': {str(e)}"
+            )
+            raise RuntimeError(f"Could not initialize output directory: {str(e)}")
+
+    def export_events(
+        self,
+        events_df: pd.DataFrame,
+        fmt: str = "feather",
+        filename: Optional[str] = None,
+    ) -> str:
+        """
+        Export events DataFrame to a columnar file
+
+        Args:
+            events_df: Pandas DataFrame with event data
+            fmt: Output format, either 'feather' or 'parquet'
+            filename: Optional custom filename
+
+        Returns:
+            Path to the exported file
+
+        Raises:
+            ValueError: If input data or format is invalid
+            RuntimeError: If export fails
+        """
+        if not isinstance(events_df, pd.DataFrame):
+            error_msg = "Input must be a pandas DataFrame"
+            self.logger.error(error_msg)
+            raise ValueError(error_msg)
+
+        if fmt not in self.FORMATS:
+            error_msg = f"Unsupported export format: {fmt}"
+            self.logger.error(error_msg)
+            raise ValueError(error_msg)
+
+        filename = (
+            filename
+            or f"calendar_events_{datetime.now().strftime('%Y%m%d_%H%M%S')}{self.FORMATS[fmt]}"
+        )
+        output_path = os.path.join(self.output_dir, filename)
+        self.logger.info(f"Exporting {len(events_df)} events to: {output_path}")
+
+        try:
+            if fmt == "feather":
+                events_df.to_feather(output_path, compression="lz4")
+            else:
+                events_df.to_parquet(output_path, engine="pyarrow", compression="zstd")
+            return output_path
+        except Exception as e:
+            error_msg = f"Failed to write {fmt} file: {str(e)}"
+            self.logger.error(error_msg)
+            raise RuntimeError(error_msg)
@@ -1,14 +1,31 @@
-import json
 import os
 import logging
 from datetime import datetime
-from typing import Optional, Dict, Any, List
-import pandas as pd
+from typing import Optional, Dict, Any, List, TYPE_CHECKING
+import orjson
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+def _json_default(val: Any) -> Any:
+    """Serialize values the json module does not handle natively"""
+    if isinstance(val, datetime):
+        return val.isoformat()
+    if hasattr(val, "timetuple"):
+        return datetime(*val.timetuple()[:6]).isoformat()
+    return str(val)
 
 
 class JsonExporter:
     """Exports calendar events to JSON format suitable for LLM input"""
 
+    # Rows serialized per write when streaming a DataFrame to disk
+    EXPORT_CHUNK_ROWS = 1000
+
+    # Output files are written through a 1 MiB buffer to keep write calls few
+    WRITE_BUFFER_SIZE = 1 << 20
+
     DEFAULT_PROMPT_TEMPLATE = """
     # Calendar Event Analysis
     Below is a JSON representation of my calendar events. Please analyze this data and provide insights about:
@@ -22,17 +39,24 @@ class JsonExporter:
     ```
     What insights can you provide based on this calendar data?"""
 
-    def __init__(self, output_dir: str = "exports", log_level: str = "INFO"):
+    def __init__(
+        self,
+        output_dir: str = "exports",
+        log_level: str = "INFO",
+        logger: Optional[logging.Logger] = None,
+    ):
         """
         Initialize the exporter with output directory and logging configuration
 
         Args:
             output_dir: Directory to save exported files
             log_level: Logging level ('DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL')
+            logger: Optional logger to use; when given, logging is left to the caller
         """
         self.output_dir = output_dir
-        self._setup_logging(log_level)
-        self.logger = logging.getLogger(__name__)
+        if logger is None:
+            self._setup_logging(log_level)
+        self.logger = logger or logging.getLogger(__name__)
 
         try:
             os.makedirs(output_dir, exist_ok=True)
@@ -44,7 +68,10 @@ class JsonExporter:
             raise RuntimeError(f"Could not initialize output directory: {str(e)}")
 
     def _setup_logging(self, log_level: str):
-        """Configure logging settings"""
+        """Configure logging settings unless the application already has"""
+        # basicConfig would do nothing, but building its handlers still opens the log file
+        if logging.getLogger().handlers:
+            return
         logging.basicConfig(
             level=log_level,
             format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
@@ -54,39 +81,142 @@ class JsonExporter:
             ],
         )
 
-    def _convert_datetime_fields(self, row: Dict[str, Any]) -> Dict[str, Any]:
-        """Convert datetime fields in a row to ISO format strings"""
-        converted = {}
-        for col, val in row.items():
-            try:
-                if val is None:
-                    converted[col] = None
-                elif isinstance(val, (datetime, pd.Timestamp)):
-                    # Handle timezone-aware datetime objects safely
-                    converted[col] = val.isoformat()
-                elif hasattr(val, 'timetuple'):  # Handle other datetime-like objects
-                    # Convert to standard datetime then to ISO format
-                    dt_val = datetime(*val.timetuple()[:6])
-                    converted[col] = dt_val.isoformat()
-                elif isinstance(val, list):
-                    converted[col] = [
-                        v.isoformat() if isinstance(v, (datetime, pd.Timestamp)) else
-                        datetime(*v.timetuple()[:6]).isoformat() if hasattr(v, 'timetuple') else v
-                        for v in val
-                    ]
-                else:
-                    converted[col] = val
-            except Exception as e:
-                # Log the specific error with field details
-                self.logger.warning(f"Failed to convert field '{col}' (type: {type(val)}): {str(e)}")
-                converted[col] = str(val) if val is not None else None  # Convert to string as fallback
-        return converted
+    def _format_datetime_columns(self, events_df: "pd.DataFrame") -> "pd.DataFrame":
+        """
+        Format every datetime column as ISO 8601 strings in one call per column
+
+        Values inside object columns (lists, COM datetimes) are left to
+        orjson and _json_default.
+        """
+        import pandas as pd
+
+        datetime_cols = [
+            col for col, dtype in events_df.dtypes.items()
+            if pd.api.types.is_datetime64_any_dtype(dtype)
+        ]
+        if not datetime_cols:
+            return events_df
+
+        events_df = events_df.copy()
+        for col in datetime_cols:
+            aware = isinstance(events_df[col].dtype, pd.DatetimeTZDtype)
+            events_df[col] = events_df[col].dt.strftime(
+                "%Y-%m-%dT%H:%M:%S%z" if aware else "%Y-%m-%dT%H:%M:%S"
+            )
+        return events_df
+
+    def _build_metadata(self, event_count: int, original_count: int) -> Dict[str, Any]:
+        """Build the metadata block written ahead of the exported events"""
+        return {
+            "exported_at": datetime.now().isoformat(),
+            "event_count": event_count,
+            "original_count": original_count,
+            "success_rate": (
+                f"{event_count/original_count:.1%}"
+                if original_count > 0
+                else "N/A"
+            ),
+            "description": "Calendar events exported from Outlook",
+        }
+
+    def _output_path(self, filename: Optional[str]) -> str:
+        """Resolve the output path, defaulting to a timestamped filename"""
+        filename = (
+            filename
+            or f"calendar_events_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        )
+        return os.path.join(self.output_dir, filename)
+
+    def export_records(
+        self, events: List[Dict[str, Any]], filename: Optional[str] = None
+    ) -> str:
+        """
+        Export a list of event dicts to a JSON file without going through pandas
+
+        Produces the same file layout as export_events; intended for small
+        exports where importing pandas costs more than the export itself.
+
+        Args:
+            events: Event dicts with JSON-compatible or datetime values
+            filename: Optional custom filename
+
+        Returns:
+            Path to the exported file
+
+        Raises:
+            RuntimeError: If export fails
+        """
+        output_path = self._output_path(filename)
+        self.logger.info(f"Exporting {len(events)} events to: {output_path}")
+
+        metadata = self._build_metadata(len(events), len(events))
+
+        try:
+            # Stream one encoded record at a time rather than one big document
+            with open(output_path, "wb", buffering=self.WRITE_BUFFER_SIZE) as f:
+                f.write(b'{"metadata": ')
+                f.write(orjson.dumps(metadata, option=orjson.OPT_INDENT_2))
+                f.write(b',\n"events": [\n')
+                for i, event in enumerate(events):
+                    if i:
+                        f.write(b",\n")
+                    f.write(orjson.dumps(event, default=_json_default,
+                                         option=orjson.OPT_SERIALIZE_NUMPY))
+                f.write(b"\n]}\n")
+            self.logger.info(
+                f"Successfully exported {len(events)} events to {output_path}"
+            )
+            return output_path
+        except (IOError, OSError, TypeError, orjson.JSONEncodeError) as e:
+            error_msg = f"Failed to write JSON file: {str(e)}"
+            self.logger.error(error_msg)
+            raise RuntimeError(error_msg)
+
+    def _cast_tz_aware_columns(self, events_df: "pd.DataFrame") -> "pd.DataFrame":
+        """
+        Format timezone-aware datetime columns as ISO 8601 strings
+
+        DataFrame.to_json converts aware timestamps to UTC and drops the
+        offset; formatting them up front keeps the original local time.
+        """
+        import pandas as pd
+
+        aware_cols = [
+            col for col, dtype in events_df.dtypes.items()
+            if isinstance(dtype, pd.DatetimeTZDtype)
+        ]
+        if not aware_cols:
+            return events_df
+
+        events_df = events_df.copy()
+        for col in aware_cols:
+            events_df[col] = events_df[col].dt.strftime("%Y-%m-%dT%H:%M:%S%z")
+        return events_df
+
+    def _serialize_rows(self, events_df: "pd.DataFrame") -> str:
+        """
+        Serialize rows to a JSON array in one vectorized call, falling back
+        to orjson only if pandas cannot encode a column
+        """
+        try:
+            return events_df.to_json(
+                orient="records", date_format="iso", date_unit="s", force_ascii=False
+            )
+        except Exception as e:
+            self.logger.warning(
+                f"Vectorized serialization failed, converting row by row: {str(e)}"
+            )
+            return orjson.dumps(
+                self._format_datetime_columns(events_df).to_dict(orient="records"),
+                default=_json_default,
+                option=orjson.OPT_SERIALIZE_NUMPY,
+            ).decode("utf-8")
 
     def export_events(
-        self, events_df: pd.DataFrame, filename: Optional[str] = None
+        self, events_df: "pd.DataFrame", filename: Optional[str] = None
     ) -> str:
         """
-        Export events DataFrame to a JSON file with progress tracking
+        Export events DataFrame to a JSON file using pandas' vectorized serializer
 
         Args:
             events_df: Pandas DataFrame with event data
@@ -99,6 +229,8 @@ class JsonExporter:
             ValueError: If input data is invalid
             RuntimeError: If export fails
         """
+        import pandas as pd
+
         self.logger.info("Starting events export process")
 
         # Input validation
@@ -111,55 +243,31 @@ class JsonExporter:
             self.logger.warning("Empty DataFrame provided for export")
 
         # Prepare filename
-        filename = (
-            filename
-            or f"calendar_events_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-        )
-        output_path = os.path.join(self.output_dir, filename)
+        output_path = self._output_path(filename)
         self.logger.info(f"Preparing to export to: {output_path}")
 
-        # Convert data with progress tracking
-        events_list = []
         total_events = len(events_df)
-
         self.logger.info(f"Processing {total_events} events...")
-        for i, (_, row) in enumerate(events_df.iterrows(), 1):
-            try:
-                event_dict = self._convert_datetime_fields(row.to_dict())
-                events_list.append(event_dict)
-
-                # Log progress every 10% or for every event if <10
-                log_interval = max(1, total_events // 10)
-                if i % log_interval == 0 or i == total_events:
-                    self.logger.info(
-                        f"Processed {i}/{total_events} events ({i/total_events:.0%})"
-                    )
-            except Exception as e:
-                self.logger.error(f"Failed to process row {i}: {str(e)}")
-                continue  # Skip bad rows but continue processing
-
-        # Prepare export structure
-        export_data = {
-            "metadata": {
-                "exported_at": datetime.now().isoformat(),
-                "event_count": len(events_list),
-                "original_count": total_events,
-                "success_rate": (
-                    f"{len(events_list)/total_events:.1%}"
-                    if total_events > 0
-                    else "N/A"
-                ),
-                "description": "Calendar events exported from Outlook",
-            },
-            "events": events_list,
-        }
 
-        # Write to file
+        metadata = self._build_metadata(total_events, total_events)
+        events_df = self._cast_tz_aware_columns(events_df)
+
+        # Stream the events to disk one chunk of rows at a time so only a
+        # single chunk's JSON is held in memory
         try:
-            with open(output_path, "w", encoding="utf-8") as f:
-                json.dump(export_data, f, ensure_ascii=False, indent=2)
+            with open(output_path, "w", encoding="utf-8", buffering=self.WRITE_BUFFER_SIZE) as f:
+                f.write('{"metadata": ')
+                f.write(orjson.dumps(metadata, option=orjson.OPT_INDENT_2).decode("utf-8"))
+                f.write(',\n"events": [')
+                for start in range(0, total_events, self.EXPORT_CHUNK_ROWS):
+                    if start:
+                        f.write(",")
+                    chunk = events_df.iloc[start:start + self.EXPORT_CHUNK_ROWS]
+                    # Drop the chunk's own array brackets
+                    f.write(self._serialize_rows(chunk)[1:-1])
+                f.write("]}\n")
             self.logger.info(
-                f"Successfully exported {len(events_list)} events to {output_path}"
+                f"Successfully exported {total_events} events to {output_path}"
             )
             return output_path
         except (IOError, OSError, TypeError) as e:
@@ -172,7 +280,7 @@ class JsonExporter:
             raise RuntimeError(error_msg)
 
     def generate_llm_prompt(
-        self, events_df: pd.DataFrame, prompt_template: Optional[str] = None
+        self, events_df: "pd.DataFrame", prompt_template: Optional[str] = None
     ) -> str:
         """
         Generate a prompt for language models with event data
@@ -188,6 +296,8 @@ class JsonExporter:
             ValueError: If input data is invalid
             RuntimeError: If prompt generation fails
         """
+        import pandas as pd
+
         self.logger.info("Starting LLM prompt generation")
 
         # Input validation
@@ -201,21 +311,13 @@ class JsonExporter:
 
         # Process events
         try:
-            events_list = []
             total_events = len(events_df)
 
             self.logger.info(f"Processing {total_events} events for prompt...")
-            for i, (_, row) in enumerate(events_df.iterrows(), 1):
-                try:
-                    event_dict = self._convert_datetime_fields(row.to_dict())
-                    events_list.append(event_dict)
-                except Exception as e:
-                    self.logger.warning(
-                        f"Failed to process row {i} for prompt: {str(e)}"
-                    )
-                    continue
-
-            events_json = json.dumps(events_list, ensure_ascii=False, indent=2)
+            events_json = self._cast_tz_aware_columns(events_df).to_json(
+                orient="records", date_format="iso", date_unit="s",
+                force_ascii=False, indent=2,
+            )
 
             template = prompt_template or self.DEFAULT_PROMPT_TEMPLATE
             prompt = template.format(events=events_json)
@@ -223,7 +325,7 @@ class JsonExporter:
             self.logger.info("Successfully generated LLM prompt")
             return prompt
 
-        except json.JSONEncodeError as e:
+        except (ValueError, TypeError, OverflowError) as e:
             error_msg = f"Failed to encode events to JSON: {str(e)}"
             self.logger.error(error_msg)
             raise RuntimeError(error_msg)
@@ -0,0 +1,62 @@
+import pandas as pd
+import streamlit as st
+from datetime import datetime, timedelta
+from src.calendar.fetcher import OutlookCalendarFetcher
+from src.utils.text_cleaner import clean_body_series, has_cutoff_marker
+
+# Appointment properties read once per event by get_events_df
+DASHBOARD_PROPERTIES = ("Subject", "Start", "End", "Organizer", "Categories", "IsRecurring", "Body")
+
+# Characters shown in the body preview, and how much of each body is cleaned for it
+BODY_PREVIEW_CHARS = 200
+BODY_HEAD_CHARS = 4096
+
+@st.cache_data(ttl=300, show_spinner=False)
+def get_events_df(days_back=7):
+    """Fetch events and convert to DataFrame with calculated fields
+    
+    Cached per days_back for five minutes, so Streamlit reruns triggered by
+    other widgets do not go back to Outlook.
+    """
+    fetcher = OutlookCalendarFetcher()
+    end_date = datetime.now()
+    start_date = end_date - timedelta(days=days_back)
+    columns = fetcher.fetch_event_columns(start_date, end_date, properties=DASHBOARD_PROPERTIES)
+    
+    # Build the DataFrame column by column from the fetched lists
+    # Outlook times are local wall-clock times; keep them as-is and tag them UTC
+    starts = pd.to_datetime(columns["Start"], utc=True)
+    ends = pd.to_datetime(columns["End"], utc=True)
+    cols = {
+        "subject": columns["Subject"],
+        "start": starts,
+        "end": ends,
+        "organizer": [organizer or "Unknown" for organizer in columns["Organizer"]],
+        "categories": [categories or "" for categories in columns["Categories"]],
+        "is_recurring": [bool(is_recurring) for is_recurring in columns["IsRecurring"]],
+        "body": columns["Body"],
+    }
+    
+    df = pd.DataFrame(cols)
+    if df.empty:
+        return df
+    
+    # Derived fields computed over whole columns
+    df["duration"] = ((df["end"] - df["start"]).dt.total_seconds() / 3600).round(2)
+    df["day_of_week"] = df["start"].dt.day_name()
+    
+    # Only the preview is shown, so bodies are cleaned from their head when
+    # that is safe: the head holds nothing a cut could start at (a block
+    # starting there may end past it) and still fills a preview
+    raw = df["body"].fillna("")
+    head = raw.str[:BODY_HEAD_CHARS]
+    body = clean_body_series(head)
+    full = (raw.str.len() > BODY_HEAD_CHARS) & (
+        has_cutoff_marker(head) | (body.str.len() < BODY_PREVIEW_CHARS)
+    )
+    if full.any():
+        body[full] = clean_body_series(raw[full])
+    df["body"] = body.where(
+        body.str.len() <= BODY_PREVIEW_CHARS, body.str[:BODY_PREVIEW_CHARS] + "..."
+    )
+    return df
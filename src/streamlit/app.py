@@ -3,91 +3,10 @@ import os
 import pandas as pd
 import streamlit as st
 import plotly.express as px
-from datetime import datetime, timedelta
-import pytz
 
 # Add the project root to the path so we can import our modules
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
-from src.calendar.fetcher import OutlookCalendarFetcher
-from src.utils.text_cleaner import clean_body_text
-
-def calculate_duration(start, end):
-    """Calculate duration of an event in hours"""
-    if not start or not end:
-        return 0
-    
-    duration = (end - start).total_seconds() / 3600
-    return round(duration, 2)
-
-def get_events_df(days_back=7):
-    """Fetch events and convert to DataFrame with calculated fields"""
-    try:
-        import pythoncom
-        pythoncom.CoInitialize()  # Initialize COM for this thread
-        
-        fetcher = OutlookCalendarFetcher()
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=days_back)
-        events = fetcher.fetch_events(start_date, end_date)
-        
-        # Convert to DataFrame with useful fields
-        events_data = []
-        for event in events:
-            try:
-                # Get start and end times
-                start = event.start.astimezone(pytz.timezone('UTC'))
-                end = event.end.astimezone(pytz.timezone('UTC'))
-                
-                # Clean the body content
-                body_content = clean_body_text(event.body) if event.body else ""
-                
-                # Calculate duration
-                duration = calculate_duration(start, end)
-                
-                # Safely extract organizer name
-                organizer_name = "Unknown"
-                try:
-                    if hasattr(event.organizer, 'name'):
-                        organizer_name = event.organizer.name
-                    elif isinstance(event.organizer, str):
-                        organizer_name = event.organizer
-                except:
-                    pass  # Keep default "Unknown"
-                
-                # More robust categories handling:
-                
-                # Get categories properly
-                categories = ""
-                if hasattr(event, 'categories'):
-                    if isinstance(event.categories, list):
-                        categories = ", ".join(event.categories)
-                    else:
-                        categories = event.categories
-                
-                events_data.append({
-                    "subject": event.subject,
-                    "start": start,
-                    "end": end,
-                    "duration": duration,
-                    "organizer": organizer_name,
-                    "categories": categories,
-                    "is_recurring": event.is_recurring if hasattr(event, 'is_recurring') else False,
-                    "day_of_week": start.strftime("%A"),
-                    "body": body_content[:200] + "..." if len(body_content) > 200 else body_content
-                })
-            except Exception as e:
-                print(f"Error processing event: {str(e)}")
-                # Continue with next event rather than failing entire process
-                continue
-                
-        return pd.DataFrame(events_data)
-    
-    finally:
-        # Always uninitialize COM when we're done
-        try:
-            pythoncom.CoUninitialize()
-        except:
-            pass
+from src.streamlit._data import get_events_df
 
 def main():
     st.set_page_config(
@@ -114,16 +33,9 @@ def main():
             return
     
     # Extract unique categories and prepare for multiselect
-    # Split categories that might contain multiple values
-    all_categories = set()
-    for cats in all_events_df['categories'].dropna():
-        if cats:  # Check if not empty
-            # Split by comma and strip whitespace
-            for cat in [c.strip() for c in cats.split(',')]:
-                if cat:  # Only add non-empty categories
-                    all_categories.add(cat)
-    
-    all_categories = sorted(list(all_categories))
+    # Split categories that might contain multiple values; the lists are reused by the filter
+    category_lists = all_events_df['categories'].fillna("").str.strip().str.split(r"\s*,\s*", regex=True)
+    all_categories = sorted(cat for cat in category_lists.explode().unique() if cat)
     
     # Set default to all categories except OOO
     default_categories = [cat for cat in all_categories if cat != "OOO"]
@@ -139,9 +51,8 @@ def main():
     # Filter dataframe based on selected categories
     if selected_categories:
         # Filter to only include rows with at least one selected category
-        mask = all_events_df['categories'].apply(
-            lambda cats: any(cat in str(cats).split(',') for cat in selected_categories) if pd.notna(cats) else False
-        )
+        selected = set(selected_categories)
+        mask = category_lists.map(lambda cats: not selected.isdisjoint(cats))
         df = all_events_df[mask].copy()
     else:
         # If nothing selected, include all
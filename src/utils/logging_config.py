@@ -0,0 +1,23 @@
+import logging
+
+# Buffer size for log files, large enough that a run rarely hits the disk
+# more than a handful of times
+LOG_BUFFER_SIZE = 1 << 16
+
+
+class BufferedFileHandler(logging.FileHandler):
+    """File handler that writes through a large buffer instead of flushing per record"""
+
+    def _open(self):
+        """Open the log file with a large write buffer"""
+        return open(self.baseFilename, self.mode, buffering=LOG_BUFFER_SIZE,
+                    encoding=self.encoding)
+
+    def flush(self):
+        """Leave routine records in the buffer; closing the file writes them out"""
+
+    def emit(self, record):
+        """Write the record, pushing the buffer to disk for warnings and errors"""
+        super().emit(record)
+        if record.levelno >= logging.WARNING:
+            logging.FileHandler.flush(self)
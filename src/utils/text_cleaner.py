@@ -1,26 +1,134 @@
+import functools
+import hashlib
 import re
+from collections import OrderedDict
+
+# Teams "Need help?" block and Teams meeting block; these need a regex.
+# Gaps inside a pattern are written so each character can only be consumed
+# one way, keeping a failed attempt linear instead of nesting lazy scans
+_BLOCK_PATTERNS = (
+    r"Need help\?[^<]*(?:<(?!https://aka\.ms/JoinTeamsMeeting\?omkt=)[^<]*)*"
+    r"<https://aka\.ms/JoinTeamsMeeting\?omkt=[^>]*>",
+    r"Microsoft Teams[^\n]*\n(?:[^J]|J(?!oin conversation))*Join conversation",
+)
+_BLOCK_RE = re.compile("|".join(f"(?:{pattern})" for pattern in _BLOCK_PATTERNS), re.DOTALL)
+
+# Literal text each block pattern starts with; the regex only runs when one is present
+_BLOCK_PROBES = ("Need help?", "Microsoft Teams")
+
+# Footers that are plain text; found with str.find instead of the regex engine.
+# A separator line is a run of 16 or more underscores, which always starts
+# with exactly this literal
+_LITERAL_CUTOFFS = (
+    "_" * 16,
+    "Click here to join",
+    "Join with a video conferencing",
+    "Join Microsoft Teams Meeting",
+)
+
+# Everything above fused into one alternation, for cleaning a whole Series.
+# A search returns the leftmost match of any alternative, which is the same
+# earliest cut _clean takes. This cuts more than applying the patterns one
+# after another did: a block that starts before another cutoff and ends after
+# it is now removed from its own start
+_CUTOFF_RE = re.compile(
+    "|".join(
+        f"(?:{pattern})"
+        for pattern in (
+            *_BLOCK_PATTERNS,
+            *map(re.escape, _LITERAL_CUTOFFS),
+        )
+    ),
+    re.DOTALL,
+)
+
+# The cutoff pattern plus everything after it, for removing the tail in one
+# substitution when cleaning a whole Series
+_CUTOFF_TAIL_RE = re.compile(f"(?:{_CUTOFF_RE.pattern}).*", re.DOTALL)
+
+# Literal text every cutoff starts with; bodies containing none of them are
+# left as they are
+_CUTOFF_PROBES = (*_BLOCK_PROBES, *_LITERAL_CUTOFFS)
+_CUTOFF_PROBES_RE = re.compile("|".join(map(re.escape, _CUTOFF_PROBES)))
+
+_BLANK_LINES_RE = re.compile(r'\n{3,}')
+
+# Bound pattern methods used by _clean, saving an attribute lookup per call
+_block_search = _BLOCK_RE.search
+_collapse_blank_lines = _BLANK_LINES_RE.sub
+
+# Bodies longer than this are cached under a digest instead of the full text
+_LARGE_BODY_CHARS = 10 * 1024
+_LARGE_BODY_CACHE_SIZE = 256
+
+_large_body_cache = OrderedDict()
+
+def _clean(body):
+    """Apply the cleanup patterns to a non-empty body"""
+    # Remove everything from the earliest "Need help?" block or meeting footer on
+    cut = len(body)
+    find = body.find
+    for literal in _LITERAL_CUTOFFS:
+        # Occurrences starting past the current cut do not matter
+        index = find(literal, 0, cut + len(literal))
+        if index != -1:
+            cut = index
+    if any(probe in body for probe in _BLOCK_PROBES):
+        match = _block_search(body)
+        if match:
+            cut = min(cut, match.start())
+    body = body[:cut]
+    
+    # Trim whitespace and remove extra blank lines
+    body = _collapse_blank_lines('\n\n', body.strip())
+    
+    return body
+
+# Occurrences of a recurring meeting share the same body, so most calls repeat
+_clean_cached = functools.lru_cache(maxsize=1024)(_clean)
 
 def clean_body_text(body):
     """Remove Microsoft Teams help information and other unnecessary content"""
     if not body:
         return ""
     
-    # Remove everything after "Need help?" line
-    body = re.split(r"Need help\?.*?<https://aka\.ms/JoinTeamsMeeting\?omkt=.*?>", body, flags=re.DOTALL)[0]
+    if len(body) <= _LARGE_BODY_CHARS:
+        return _clean_cached(body)
     
-    # Additional cleanup: remove common meeting footers
-    patterns = [
-        r"Microsoft Teams.*?(?:\r\n|\n).*?Join conversation",
-        r"________________+.*$",
-        r"Click here to join.*$",
-        r"Join with a video conferencing.*$",
-        r"Join Microsoft Teams Meeting.*$",
-    ]
-    
-    for pattern in patterns:
-        body = re.split(pattern, body, flags=re.DOTALL)[0]
-    
-    # Trim whitespace and remove extra blank lines
-    body = re.sub(r'\n{3,}', '\n\n', body.strip())
+    # Key large bodies on a digest so the cache does not pin their full text
+    key = hashlib.blake2b(body.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+    cleaned = _large_body_cache.get(key)
+    if cleaned is not None:
+        _large_body_cache.move_to_end(key)
+        return cleaned
     
-    return body
\ No newline at end of file
+    cleaned = _large_body_cache[key] = _clean(body)
+    if len(_large_body_cache) > _LARGE_BODY_CACHE_SIZE:
+        _large_body_cache.popitem(last=False)
+    return cleaned
+
+def clean_body_series(bodies):
+    """
+    Apply clean_body_text to a whole pandas Series of bodies at once
+
+    Args:
+        bodies: Series of raw body strings (missing values become "")
+
+    Returns:
+        Series of cleaned bodies
+    """
+    bodies = bodies.fillna("").astype(str)
+    bodies = bodies.str.replace(_CUTOFF_TAIL_RE, "", n=1, regex=True)
+    return bodies.str.strip().str.replace(_BLANK_LINES_RE, "\n\n", regex=True)
+
+def has_cutoff_marker(bodies):
+    """
+    Flag bodies containing text that a cleanup cut could start at
+
+    Args:
+        bodies: Series of body strings
+
+    Returns:
+        Boolean Series, False where cleaning can only trim whitespace
+    """
+    return bodies.fillna("").astype(str).str.contains(_CUTOFF_PROBES_RE)
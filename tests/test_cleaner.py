@@ -0,0 +1,78 @@
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from src.utils import text_cleaner
+from src.utils.text_cleaner import clean_body_series, clean_body_text, has_cutoff_marker
+
+TEAMS_LINK = "<https://aka.ms/JoinTeamsMeeting?omkt=en-US>"
+
+# (raw body, cleaned body)
+CASES = [
+    ("", ""),
+    ("Agenda\n\n\n\nItems  ", "Agenda\n\nItems"),
+    (f"Agenda\nNeed help? {TEAMS_LINK} tail", "Agenda"),
+    ("Agenda\nMicrosoft Teams meeting\nJoin on your computer\nJoin conversation\nmore", "Agenda"),
+    ("Notes\n" + "_" * 20 + "\nfooter", "Notes"),
+    ("Notes\n" + "_" * 15 + "\nkept", "Notes\n" + "_" * 15 + "\nkept"),
+    ("Hi\nClick here to join the meeting", "Hi"),
+    ("Hi\nJoin with a video conferencing device", "Hi"),
+    ("Hi\nJoin Microsoft Teams Meeting\nx", "Hi"),
+    ("Keep\nJoin Microsoft Teams Meeting\nNeed help? " + TEAMS_LINK, "Keep"),
+    # Incomplete blocks are not cut
+    ("Hi\nNeed help? no link here", "Hi\nNeed help? no link here"),
+    ("Hi\nMicrosoft Teams meeting\nno join", "Hi\nMicrosoft Teams meeting\nno join"),
+]
+
+# Bodies where the earliest-cut cleaner removes more than the original
+# sequential splits did: (raw body, cleaned body)
+DIVERGENCES = [
+    # A footer followed by a Teams block no longer leaves a dangling "Join"
+    # (the original gave "Hi\nJoin")
+    ("Hi\nJoin Microsoft Teams Meeting\nJoin conversation", "Hi"),
+    ("Hi\nJoin Microsoft Teams Meeting\nMicrosoft Teams\nJoin conversation", "Hi"),
+    # A Teams block spanning the Need-help block is cut from its own start
+    # (the original kept the text up to the Need-help line)
+    (f"Hi\nMicrosoft Teams meeting\nJoin Need help? {TEAMS_LINK}\nJoin conversation", "Hi"),
+    (f"Microsoft Teams\n>Need help?Join conversation{TEAMS_LINK}tail", ""),
+]
+
+
+class CleanBodyTextTest(unittest.TestCase):
+    def test_cases(self):
+        for body, expected in CASES:
+            with self.subTest(body=body):
+                self.assertEqual(clean_body_text(body), expected)
+
+    def test_none(self):
+        self.assertEqual(clean_body_text(None), "")
+
+    def test_divergences(self):
+        for body, expected in DIVERGENCES:
+            with self.subTest(body=body):
+                self.assertEqual(clean_body_text(body), expected)
+
+    def test_large_body_cached_by_digest(self):
+        body = "y" * 20000 + "\nClick here to join"
+        cache_size = len(text_cleaner._large_body_cache)
+        with mock.patch.object(text_cleaner, "_clean", wraps=text_cleaner._clean) as clean:
+            self.assertEqual(clean_body_text(body), "y" * 20000)
+            self.assertEqual(clean_body_text(body), "y" * 20000)
+        clean.assert_called_once_with(body)
+        self.assertEqual(len(text_cleaner._large_body_cache), cache_size + 1)
+
+
+class CleanBodySeriesTest(unittest.TestCase):
+    def test_matches_clean_body_text(self):
+        bodies = [body for body, _ in CASES] + [body for body, _ in DIVERGENCES] + [None]
+        cleaned = clean_body_series(pd.Series(bodies, dtype=object))
+        self.assertEqual(cleaned.tolist(), [clean_body_text(body) for body in bodies])
+
+    def test_has_cutoff_marker(self):
+        bodies = pd.Series(["plain text", f"Need help? {TEAMS_LINK}", "Hi\nClick here to join", None])
+        self.assertEqual(has_cutoff_marker(bodies).tolist(), [False, True, True, False])
+
+
+if __name__ == "__main__":
+    unittest.main()
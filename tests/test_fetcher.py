@@ -0,0 +1,106 @@
+import sys
+import types
+import unittest
+from datetime import datetime
+
+# Stand-ins for the pywin32 modules, used only where pywin32 is not installed
+try:
+    import pythoncom  # noqa: F401
+except ImportError:
+    pythoncom = types.ModuleType("pythoncom")
+    pythoncom.com_error = type("com_error", (Exception,), {})
+    pythoncom.CoInitialize = pythoncom.CoUninitialize = lambda: None
+    sys.modules["pythoncom"] = pythoncom
+    win32com = types.ModuleType("win32com")
+    win32com.client = types.ModuleType("win32com.client")
+    sys.modules["win32com"] = win32com
+    sys.modules["win32com.client"] = win32com.client
+
+from src.calendar.fetcher import OutlookCalendarFetcher, _OCCURRENCE_STATE
+
+WINDOW = (datetime(2024, 1, 1), datetime(2024, 1, 8))
+
+
+class FakeItem:
+    """Appointment item that counts Body reads"""
+
+    def __init__(self, subject, day, end=True, categories="", body="",
+                 recurrence_state=0, series_id=None):
+        self.Subject = subject
+        self.Start = datetime(2024, 1, day, 9)
+        self.End = datetime(2024, 1, day, 10) if end else None
+        self.Location = ""
+        self.Categories = categories
+        self.RecurrenceState = recurrence_state
+        self.GlobalAppointmentID = series_id
+        self._body = body
+        self.body_reads = 0
+
+    @property
+    def Body(self):
+        self.body_reads += 1
+        return self._body
+
+
+class FakeItems:
+    """Items collection supporting the Sort/Find/FindNext scan"""
+
+    def __init__(self, items):
+        self._items = items
+        self.IncludeRecurrences = False
+
+    def Sort(self, key):
+        self._items.sort(key=lambda item: item.Start)
+
+    def Find(self, restriction):
+        self._iter = iter(self._items)
+        return next(self._iter, None)
+
+    def FindNext(self):
+        return next(self._iter, None)
+
+
+def make_fetcher(items):
+    return OutlookCalendarFetcher(calendar=types.SimpleNamespace(Items=FakeItems(items)))
+
+
+class IterEventRowsTest(unittest.TestCase):
+    def test_rows_in_start_order(self):
+        fetcher = make_fetcher([FakeItem("b", 3), FakeItem("a", 2)])
+        rows = list(fetcher.iter_event_rows(*WINDOW))
+        self.assertEqual([row.Subject for row in rows], ["a", "b"])
+        self.assertEqual(rows[0].Start, datetime(2024, 1, 2, 9))
+        self.assertEqual(rows[0].End, datetime(2024, 1, 2, 10))
+
+    def test_excluded_category_skipped(self):
+        fetcher = make_fetcher([FakeItem("out", 2, categories="Work, OOO"), FakeItem("in", 3)])
+        rows = list(fetcher.iter_event_rows(*WINDOW, exclude_categories=("OOO",)))
+        self.assertEqual([row.Subject for row in rows], ["in"])
+
+    def test_single_property(self):
+        fetcher = make_fetcher([FakeItem("a", 2), FakeItem("b", 3)])
+        columns = fetcher.fetch_event_columns(*WINDOW, properties=("Subject",))
+        self.assertEqual(columns, {"Subject": ["a", "b"]})
+
+    def test_missing_end_skipped(self):
+        fetcher = make_fetcher([FakeItem("no end", 2, end=False), FakeItem("ok", 3)])
+        rows = list(fetcher.iter_event_rows(*WINDOW))
+        self.assertEqual([row.Subject for row in rows], ["ok"])
+
+    def test_occurrences_read_series_body_once(self):
+        first, second = (
+            FakeItem("standup", day, body="notes", recurrence_state=_OCCURRENCE_STATE, series_id="s1")
+            for day in (2, 3)
+        )
+        columns = make_fetcher([first, second]).fetch_event_columns(*WINDOW)
+        self.assertEqual(columns["Body"], ["notes", "notes"])
+        self.assertEqual(first.body_reads + second.body_reads, 1)
+
+    def test_events_past_window_end_stop_scan(self):
+        fetcher = make_fetcher([FakeItem("in", 2), FakeItem("out", 9)])
+        self.assertEqual(fetcher.fetch_event_columns(*WINDOW, properties=("Subject",)),
+                         {"Subject": ["in"]})
+
+
+if __name__ == "__main__":
+    unittest.main()